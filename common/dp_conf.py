@@ -6,6 +6,9 @@ import json
 import time
 from math import floor
 from system.hardware import TICI
+from system.version import get_commit, is_dirty
+
+CAR_LIST_CACHE = '/data/dp_car_list_cache.json'
 
 '''
 * type: Bool, Int8, UInt8, UInt16, Float32
@@ -271,9 +274,22 @@ def gen_log_struct():
 function to generate support car list
 '''
 def get_support_car_list():
+  # the list only changes with the code, so cache it per commit and skip the imports on a hit.
+  # a dirty tree may have edited ports, so always rebuild there
+  commit = get_commit()
+  use_cache = commit is not None and not is_dirty()
+  if use_cache:
+    try:
+      with open(CAR_LIST_CACHE) as f:
+        cache = json.load(f)
+      if cache['commit'] == commit:
+        return cache['cars']
+    except (OSError, ValueError, KeyError, TypeError):
+      pass
+
   attrs = ['FINGERPRINTS', 'FW_VERSIONS']
   cars = dict({"cars": []})
-  models = []
+  models = set()
   for car_folder in [x[0] for x in os.walk('/data/openpilot/selfdrive/car')]:
     try:
       car_name = car_folder.split('/')[-1]
@@ -285,14 +301,21 @@ def get_support_car_list():
           else:
             continue
           if isinstance(attr_values, dict):
-            for f, v in attr_values.items():
-              if f not in models:
-                models.append(f)
+            models.update(attr_values.keys())
     except (ImportError, IOError, ValueError):
       pass
-  models.sort()
-  cars["cars"] = models
-  return json.dumps(cars)
+  cars["cars"] = sorted(models)
+  car_list = json.dumps(cars)
+
+  if use_cache:
+    try:
+      tmp_path = f"{CAR_LIST_CACHE}.{os.getpid()}.tmp"
+      with open(tmp_path, 'w') as f:
+        json.dump({'commit': commit, 'cars': car_list}, f)
+      os.rename(tmp_path, CAR_LIST_CACHE)
+    except OSError:
+      pass
+  return car_list
 
 '''
 function to init param value.
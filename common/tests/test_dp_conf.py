@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import common.dp_conf as dp_conf
+
+
+class TestSupportCarListCache(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir = tempfile.mkdtemp()
+    self.cache_path = os.path.join(self.tmpdir, 'dp_car_list_cache.json')
+
+    self.patches = [
+      mock.patch.object(dp_conf, 'CAR_LIST_CACHE', self.cache_path),
+      mock.patch.object(dp_conf, 'get_commit', return_value='abc123'),
+      mock.patch.object(dp_conf, 'is_dirty', return_value=False),
+    ]
+    for p in self.patches:
+      p.start()
+
+  def tearDown(self):
+    for p in self.patches:
+      p.stop()
+    shutil.rmtree(self.tmpdir)
+
+  def test_cache_miss_writes_file(self):
+    car_list = dp_conf.get_support_car_list()
+    with open(self.cache_path) as f:
+      cache = json.load(f)
+    self.assertEqual(cache['commit'], 'abc123')
+    self.assertEqual(cache['cars'], car_list)
+
+  def test_cache_hit_returns_file_contents(self):
+    cached = json.dumps({"cars": ["CACHED CAR"]})
+    with open(self.cache_path, 'w') as f:
+      json.dump({'commit': 'abc123', 'cars': cached}, f)
+
+    with mock.patch.object(dp_conf.os, 'walk') as walk:
+      self.assertEqual(dp_conf.get_support_car_list(), cached)
+      walk.assert_not_called()
+
+  def test_stale_commit_rebuilds(self):
+    cached = json.dumps({"cars": ["CACHED CAR"]})
+    with open(self.cache_path, 'w') as f:
+      json.dump({'commit': 'old', 'cars': cached}, f)
+
+    self.assertNotEqual(dp_conf.get_support_car_list(), cached)
+    with open(self.cache_path) as f:
+      self.assertEqual(json.load(f)['commit'], 'abc123')
+
+  def test_dirty_skips_cache(self):
+    with mock.patch.object(dp_conf, 'is_dirty', return_value=True):
+      dp_conf.get_support_car_list()
+    self.assertFalse(os.path.exists(self.cache_path))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -82,18 +82,27 @@ def install_dep(spinner):
     if os.path.exists(f'{PYEXTRA_DIR}/bin'):
       shutil.rmtree(f'{PYEXTRA_DIR}/bin')
 
-  dup = 'cp -rf /data/openpilot/pyextra /data/pyextra_community'
-  process_dup = subprocess.Popen(dup, stdout=subprocess.PIPE, shell=True)
+  # keep a copy so later boots can restore it without a download, failing here must not stop the launch
+  try:
+    shutil.copytree(PYEXTRA_DIR, DP_PYEXTRA_DIR, symlinks=True, dirs_exist_ok=True)
+  except OSError as e:
+    print(f'dp: Failed to copy {PYEXTRA_DIR} to {DP_PYEXTRA_DIR}: {e}')
 
 
 if __name__ == "__main__" and (OPSPLINE_SPEC is None or OVERPY_SPEC is None):
   spinner = Spinner()
   if os.path.exists(DP_PYEXTRA_DIR):
     spinner.update("Loading dependencies")
-    command = 'rm -rf /data/openpilot/pyextra; cp -rf /data/pyextra_community /data/openpilot/pyextra'
-    process = subprocess.Popen(command, stdout=subprocess.PIPE, shell=True)
+    shutil.rmtree(PYEXTRA_DIR, ignore_errors=True)
     print("dp: Removed directory /data/openpilot/pyextra")
-    print("dp: Copied /data/pyextra_community to /data/openpilot/pyextra")
+    try:
+      shutil.copytree(DP_PYEXTRA_DIR, PYEXTRA_DIR, symlinks=True, dirs_exist_ok=True)
+      print("dp: Copied /data/pyextra_community to /data/openpilot/pyextra")
+    except OSError as e:
+      # a failure here must not stop the launch, reinstall instead
+      print(f"dp: Failed to copy /data/pyextra_community to /data/openpilot/pyextra: {e}")
+      spinner.update("Waiting for internet")
+      install_dep(spinner)
   else:
     spinner.update("Waiting for internet")
     install_dep(spinner)
@@ -5,13 +5,15 @@ import signal
 import subprocess
 import sys
 import traceback
-from typing import List, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Set, Tuple, Union
 
 from cereal import log
 import cereal.messaging as messaging
 import selfdrive.sentry as sentry
 from common.basedir import BASEDIR
 from common.params import Params, ParamKeyType
+from common.realtime import DT_TRML
 from common.text_window import TextWindow
 from selfdrive.boardd.set_time import set_time
 from system.hardware import HARDWARE, PC, TICI
@@ -28,44 +30,50 @@ from common.dp_conf import init_params_vals
 
 sys.path.append(os.path.join(BASEDIR, "pyextra"))
 
+DEFAULT_PARAMS: Tuple[Tuple[str, bytes], ...] = (
+  ("CompletedTrainingVersion", b"0"),
+  ("DisengageOnAccelerator", b"0"),
+  ("GsmMetered", b"1"),
+  ("HasAcceptedTerms", b"0"),
+  ("LanguageSetting", b"main_en"),
+  ("OpenpilotEnabledToggle", b"1"),
+  ("LongitudinalPersonality", str(log.LongitudinalPersonality.standard).encode('utf8')),
+  #("ShowDebugUI", b"0"),
+  ("SpeedLimitControl", b"0"),
+  ("SpeedLimitPercOffset", b"0"),
+  ("TurnSpeedControl", b"0"),
+  ("TurnVisionControl", b"0"),
+)
+
+# indexed by is_alive()
+STATUS_COLORS = ("\u001b[31m", "\u001b[32m")
+
+
+def manager_init(params: Optional[Params] = None) -> None:
+  if params is None:
+    params = Params()
 
-def manager_init() -> None:
   # update system time from panda
   set_time(cloudlog)
 
   # save boot log
-  if not Params().get_bool('dp_jetson'):
+  if not params.get_bool('dp_jetson'):
     subprocess.call("./bootlog", cwd=os.path.join(BASEDIR, "system/loggerd"))
 
-  params = Params()
   params.clear_all(ParamKeyType.CLEAR_ON_MANAGER_START)
   params.clear_all(ParamKeyType.CLEAR_ON_ONROAD_TRANSITION)
   params.clear_all(ParamKeyType.CLEAR_ON_OFFROAD_TRANSITION)
 
-  default_params: List[Tuple[str, Union[str, bytes]]] = [
-    ("CompletedTrainingVersion", "0"),
-    ("DisengageOnAccelerator", "0"),
-    ("GsmMetered", "1"),
-    ("HasAcceptedTerms", "0"),
-    ("LanguageSetting", "main_en"),
-    ("OpenpilotEnabledToggle", "1"),
-    ("LongitudinalPersonality", str(log.LongitudinalPersonality.standard)),
-    #("ShowDebugUI", "0"),
-    ("SpeedLimitControl", "0"),
-    ("SpeedLimitPercOffset", "0"),
-    ("TurnSpeedControl", "0"),
-    ("TurnVisionControl", "0"),
-  ]
-  if not PC:
-    default_params.append(("LastUpdateTime", datetime.datetime.utcnow().isoformat().encode('utf8')))
-
   if params.get_bool("RecordFrontLock"):
     params.put_bool("RecordFront", True)
 
-  # set unset params
-  for k, v in default_params:
-    if params.get(k) is None:
+  # set unset params, scanning the params dir once instead of a get() per key
+  existing_params = set(os.listdir(params.get_param_path()))
+  for k, v in DEFAULT_PARAMS:
+    if k not in existing_params:
       params.put(k, v)
+  if not PC and "LastUpdateTime" not in existing_params:
+    params.put("LastUpdateTime", datetime.datetime.utcnow().isoformat().encode('utf8'))
 
   # dp init params
   init_params_vals(params)
@@ -85,15 +93,26 @@ def manager_init() -> None:
   except PermissionError:
     print("WARNING: failed to make /dev/shm")
 
-  # set version params
-  params.put("Version", get_version())
-  params.put("TermsVersion", terms_version)
-  params.put("TrainingVersion", training_version)
-  params.put("GitCommit", get_commit(default=""))
-  params.put("GitBranch", get_short_branch(default=""))
-  params.put("GitRemote", get_origin(default=""))
-  params.put_bool("IsTestedBranch", is_tested_branch())
-  params.put_bool("IsReleaseBranch", is_release_branch())
+  # fetch git info once, the version helpers cache per argument so mixing defaults reruns git
+  version = get_version()
+  commit = get_commit()
+  branch = get_short_branch()
+  origin = get_origin()
+  dirty = is_dirty()
+
+  # set version params, overlapping the writes since each put blocks on fsync
+  version_params: List[Tuple[str, Union[str, bytes]]] = [
+    ("Version", version),
+    ("TermsVersion", terms_version),
+    ("TrainingVersion", training_version),
+    ("GitCommit", commit or ""),
+    ("GitBranch", branch or ""),
+    ("GitRemote", origin or ""),
+    ("IsTestedBranch", b"1" if is_tested_branch() else b"0"),
+    ("IsReleaseBranch", b"1" if is_release_branch() else b"0"),
+  ]
+  with ThreadPoolExecutor(max_workers=len(version_params)) as executor:
+    list(executor.map(lambda kv: params.put(*kv), version_params))
 
   # set dongle id
   reg_res = register(show_spinner=True)
@@ -104,17 +123,17 @@ def manager_init() -> None:
     raise Exception(f"Registration failed for device {serial}")
   os.environ['DONGLE_ID'] = dongle_id  # Needed for swaglog
 
-  if not is_dirty():
+  if not dirty:
     os.environ['CLEAN'] = '1'
 
   # init logging
   sentry.init(sentry.SentryProject.SELFDRIVE)
   cloudlog.bind_global(dongle_id=dongle_id,
-                       version=get_version(),
+                       version=version,
                        origin=get_normalized_origin(),
-                       branch=get_short_branch(),
-                       commit=get_commit(),
-                       dirty=is_dirty(),
+                       branch=branch,
+                       commit=commit,
+                       dirty=dirty,
                        device=HARDWARE.get_device_type())
 
 
@@ -128,94 +147,131 @@ def manager_cleanup() -> None:
   for p in managed_processes.values():
     p.stop(block=False)
 
-  # ensure all are killed
-  for p in managed_processes.values():
-    p.stop(block=True)
+  # ensure all are killed, joining in parallel so shutdown takes the slowest process instead of the sum
+  with ThreadPoolExecutor(max_workers=len(managed_processes)) as executor:
+    list(executor.map(lambda p: p.stop(block=True), managed_processes.values()))
 
   cloudlog.info("everything is dead")
 
 
-def manager_thread() -> None:
+def log_onroad_params_error(future: Future) -> None:
+  exc = future.exception()
+  if exc is not None:
+    cloudlog.error("failed to write onroad params", exc_info=exc)
+
+
+def manager_thread(params: Optional[Params] = None) -> None:
   cloudlog.bind(daemon="manager")
   cloudlog.info("manager start")
   cloudlog.info({"environ": os.environ})
 
-  params = Params()
+  if params is None:
+    params = Params()
 
-  ignore: List[str] = []
+  ignore: Set[str] = set()
 
   # dp
   dp_nav = params.get_bool('dp_nav')
   dp_otisserv = dp_nav and params.get_bool('dp_otisserv')
   dp_jetson = params.get_bool('dp_jetson')
-  ignore += ['dmonitoringmodeld', 'dmonitoringd'] if dp_jetson else []
-  ignore += ['navd', 'mapsd'] if not dp_nav else []
-  ignore += ['otisserv'] if not dp_nav or not dp_otisserv else []
+  if dp_jetson:
+    ignore.update(['dmonitoringmodeld', 'dmonitoringd'])
+  if not dp_nav:
+    ignore.update(['navd', 'mapsd'])
+  if not dp_nav or not dp_otisserv:
+    ignore.add('otisserv')
   dp_mapd = params.get_bool('dp_mapd')
-  ignore += ['mapd'] if not dp_mapd else []
-  ignore += ['gpxd'] if not dp_otisserv and not dp_mapd and not params.get_bool('dp_gpxd') else []
-  ignore += ['uploader'] if not params.get_bool('dp_api_custom') and dp_jetson else []
+  if not dp_mapd:
+    ignore.add('mapd')
+  if not dp_otisserv and not dp_mapd and not params.get_bool('dp_gpxd'):
+    ignore.add('gpxd')
+  if not params.get_bool('dp_api_custom') and dp_jetson:
+    ignore.add('uploader')
   if dp_jetson:
-    ignore += ['logcatd', 'proclogd', 'loggerd', 'logmessaged', 'encoderd', 'uploader']
+    ignore.update(['logcatd', 'proclogd', 'loggerd', 'logmessaged', 'encoderd', 'uploader'])
 
   if params.get("DongleId", encoding='utf8') in (None, UNREGISTERED_DONGLE_ID):
-    ignore += ["manage_athenad", "uploader"]
+    ignore.update(["manage_athenad", "uploader"])
   if os.getenv("NOBOARD") is not None:
-    ignore.append("pandad")
-  ignore += [x for x in os.getenv("BLOCK", "").split(",") if len(x) > 0]
+    ignore.add("pandad")
+  ignore.update(x for x in os.getenv("BLOCK", "").split(",") if len(x) > 0)
 
   sm = messaging.SubMaster(['deviceState', 'carParams'], poll=['deviceState'])
   pm = messaging.PubMaster(['managerState'])
 
-  write_onroad_params(False, params)
-  ensure_running(managed_processes.values(), False, params=params, CP=sm['carParams'], not_run=ignore)
-
-  started_prev = False
-
-  while True:
-    sm.update()
-
-    started = sm['deviceState'].started
-
-    if started and not started_prev:
-      params.clear_all(ParamKeyType.CLEAR_ON_ONROAD_TRANSITION)
-    elif not started and started_prev:
-      params.clear_all(ParamKeyType.CLEAR_ON_OFFROAD_TRANSITION)
-
-    # update onroad params, which drives boardd's safety setter thread
-    if started != started_prev:
-      write_onroad_params(started, params)
-
-    started_prev = started
-
-    ensure_running(managed_processes.values(), started, params=params, CP=sm['carParams'], not_run=ignore)
+  # the set of managed processes is fixed, so walk a plain list each tick
+  procs = list(managed_processes.values())
 
-    running = ' '.join("%s%s\u001b[0m" % ("\u001b[32m" if p.proc.is_alive() else "\u001b[31m", p.name)
-                       for p in managed_processes.values() if p.proc)
-    print(running)
-    cloudlog.debug(running)
+  # offroad processes started below read these, so the initial write blocks
+  write_onroad_params(False, params)
 
-    # send managerState
-    msg = messaging.new_message('managerState')
-    msg.managerState.processes = [p.get_process_state_msg() for p in managed_processes.values()]
-    pm.send('managerState', msg)
+  # transition writes go through a single worker so they don't block the loop but still land in order
+  onroad_params_executor = ThreadPoolExecutor(max_workers=1)
+  ensure_running(procs, False, params=params, CP=sm['carParams'], not_run=ignore)
 
-    # Exit main loop when uninstall/shutdown/reboot is needed
-    shutdown = False
-    for param in ("DoUninstall", "DoShutdown", "DoReboot"):
-      if params.get_bool(param):
-        shutdown = True
-        params.put("LastManagerExitReason", f"{param} {datetime.datetime.now()}")
-        cloudlog.warning(f"Shutting down manager - {param} set")
+  started_prev = False
 
-    if shutdown:
-      break
+  try:
+    while True:
+      sm.update()
+
+      started = sm['deviceState'].started
+
+      if started and not started_prev:
+        params.clear_all(ParamKeyType.CLEAR_ON_ONROAD_TRANSITION)
+      elif not started and started_prev:
+        params.clear_all(ParamKeyType.CLEAR_ON_OFFROAD_TRANSITION)
+
+      # update onroad params, which drives boardd's safety setter thread
+      if started != started_prev:
+        future = onroad_params_executor.submit(write_onroad_params, started, params)
+        future.add_done_callback(log_onroad_params_error)
+
+      started_prev = started
+
+      ensure_running(procs, started, params=params, CP=sm['carParams'], not_run=ignore)
+
+      # build the managerState entries and the status line in a single pass
+      print_status = sm.frame % int(5. / DT_TRML) == 0
+      proc_states = []
+      running = []
+      for p in procs:
+        state = p.get_process_state_msg()
+        proc_states.append(state)
+        if print_status and p.proc:
+          running.append(STATUS_COLORS[state.running] + p.name + "\u001b[0m")
+
+      if print_status:
+        status = ' '.join(running)
+        print(status)
+        cloudlog.debug(status)
+
+      # send managerState
+      msg = messaging.new_message('managerState')
+      msg.managerState.processes = proc_states
+      pm.send('managerState', msg)
+
+      # Exit main loop when uninstall/shutdown/reboot is needed, polled once a second since these are rarely set
+      shutdown = False
+      if sm.frame % int(1. / DT_TRML) == 0:
+        for param in ("DoUninstall", "DoShutdown", "DoReboot"):
+          if params.get_bool(param):
+            shutdown = True
+            params.put("LastManagerExitReason", f"{param} {datetime.datetime.now()}")
+            cloudlog.warning(f"Shutting down manager - {param} set")
+
+      if shutdown:
+        break
+  finally:
+    # make sure pending onroad param writes land before cleanup and any reboot/shutdown
+    onroad_params_executor.shutdown(wait=True)
 
 
 def main() -> None:
   prepare_only = os.getenv("PREPAREONLY") is not None
 
-  manager_init()
+  params = Params()
+  manager_init(params)
 
   # Start UI early so prepare can happen in the background
   if not prepare_only:
@@ -230,14 +286,13 @@ def main() -> None:
   signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
 
   try:
-    manager_thread()
+    manager_thread(params)
   except Exception:
-    traceback.print_exc()
+    # capture_exception logs the traceback through cloudlog, which already prints errors to stderr
     sentry.capture_exception()
   finally:
     manager_cleanup()
 
-  params = Params()
   if params.get_bool("DoUninstall"):
     cloudlog.warning("uninstalling")
     HARDWARE.uninstall()
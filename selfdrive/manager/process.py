@@ -4,7 +4,7 @@ import signal
 import struct
 import time
 import subprocess
-from typing import Optional, Callable, List, ValuesView
+from typing import Optional, Callable, Collection, Iterable, List
 from abc import ABC, abstractmethod
 from multiprocessing import Process
 
@@ -83,6 +83,9 @@ class ManagerProcess(ABC):
   watchdog_seen = False
   shutting_down = False
 
+  state_key: Optional[tuple] = None
+  state_msg: Optional[log.ManagerState.ProcessState] = None
+
   @abstractmethod
   def prepare(self) -> None:
     pass
@@ -176,13 +179,25 @@ class ManagerProcess(ABC):
     os.kill(self.proc.pid, sig)
 
   def get_process_state_msg(self):
+    # only rebuild the message when the process state changed
+    alive = False
+    state_key: tuple = (False,)
+    if self.proc is not None:
+      alive = self.proc.is_alive()
+      state_key = (True, alive, self.shutting_down, self.proc.pid, self.proc.exitcode)
+    if self.state_msg is not None and state_key == self.state_key:
+      return self.state_msg
+
     state = log.ManagerState.ProcessState.new_message()
     state.name = self.name
     if self.proc:
-      state.running = self.proc.is_alive()
+      state.running = alive
       state.shouldBeRunning = self.proc is not None and not self.shutting_down
       state.pid = self.proc.pid or 0
       state.exitCode = self.proc.exitcode or 0
+
+    self.state_key = state_key
+    self.state_msg = state
     return state
 
 
@@ -294,10 +309,10 @@ class DaemonProcess(ManagerProcess):
     pass
 
 
-def ensure_running(procs: ValuesView[ManagerProcess], started: bool, params=None, CP: car.CarParams=None,
-                   not_run: Optional[List[str]]=None) -> List[ManagerProcess]:
+def ensure_running(procs: Iterable[ManagerProcess], started: bool, params=None, CP: car.CarParams=None,
+                   not_run: Optional[Collection[str]]=None) -> List[ManagerProcess]:
   if not_run is None:
-    not_run = []
+    not_run = set()
 
   running = []
   for p in procs:
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import unittest
+from unittest import mock
+
+from selfdrive.manager.process import NativeProcess
+
+
+class TestProcessStateMsg(unittest.TestCase):
+  def setUp(self):
+    self.p = NativeProcess("testproc", "", ["true"])
+    self.p.proc = mock.Mock(pid=1234, exitcode=None)
+    self.p.proc.is_alive.return_value = True
+
+  def test_reused_when_unchanged(self):
+    state = self.p.get_process_state_msg()
+    self.assertTrue(state.running)
+    self.assertEqual(state.pid, 1234)
+    self.assertIs(self.p.get_process_state_msg(), state)
+
+  def test_rebuilt_on_pid_change(self):
+    state = self.p.get_process_state_msg()
+    self.p.proc.pid = 5678
+    new_state = self.p.get_process_state_msg()
+    self.assertIsNot(new_state, state)
+    self.assertEqual(new_state.pid, 5678)
+
+  def test_rebuilt_on_exitcode_change(self):
+    state = self.p.get_process_state_msg()
+    self.p.proc.exitcode = 1
+    self.p.proc.is_alive.return_value = False
+    new_state = self.p.get_process_state_msg()
+    self.assertIsNot(new_state, state)
+    self.assertEqual(new_state.exitCode, 1)
+    self.assertFalse(new_state.running)
+
+  def test_rebuilt_on_shutting_down(self):
+    state = self.p.get_process_state_msg()
+    self.assertTrue(state.shouldBeRunning)
+    self.p.shutting_down = True
+    new_state = self.p.get_process_state_msg()
+    self.assertIsNot(new_state, state)
+    self.assertFalse(new_state.shouldBeRunning)
+
+  def test_rebuilt_when_proc_cleared(self):
+    state = self.p.get_process_state_msg()
+    self.p.proc = None
+    new_state = self.p.get_process_state_msg()
+    self.assertIsNot(new_state, state)
+    self.assertFalse(new_state.running)
+    self.assertEqual(new_state.pid, 0)
+    self.assertIs(self.p.get_process_state_msg(), new_state)
+
+
+if __name__ == "__main__":
+  unittest.main()
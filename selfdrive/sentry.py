@@ -11,6 +11,7 @@ from system.version import get_branch, get_commit, get_origin, get_version, \
                               is_comma_remote, is_dirty, is_tested_branch
 
 import os
+import threading
 import traceback
 import requests
 from cereal import car
@@ -91,11 +92,14 @@ def capture_info(info_string):
 
 def get_ip_address():
   try:
-    ip = requests.get('https://checkip.amazonaws.com/').text.strip()
+    ip = requests.get('https://checkip.amazonaws.com/', timeout=10).text.strip()
   except Exception:
     ip = "255.255.255.255"
   return ip
 
+def set_ip_address_extra(hub: sentry_sdk.Hub) -> None:
+  hub.scope.set_extra("ip_address", get_ip_address())
+
 def set_tag(key: str, value: str) -> None:
   sentry_sdk.set_tag(key, value)
 
@@ -115,7 +119,6 @@ def init(project: SentryProject) -> None:
   env = "release" if is_tested_branch() else "master"
   dongle_id = Params().get("DongleId", encoding='utf-8')
   gitname = Params().get("GithubUsername", encoding='utf-8')
-  ip = get_ip_address()
 
   integrations = []
   if project == SentryProject.SELFDRIVE:
@@ -141,7 +144,10 @@ def init(project: SentryProject) -> None:
     scope.set_tag("commit", get_commit())
     scope.set_tag("device", HARDWARE.get_device_type())
     scope.set_tag("model", car_name)
-    scope.set_extra("ip_address", ip)
+
+  # the ip lookup is a network round trip, don't hold up startup for it.
+  # threads get their own hub, so pass in the one that was just configured
+  threading.Thread(target=set_ip_address_extra, args=(sentry_sdk.Hub.current,), daemon=True).start()
 
   if project == SentryProject.SELFDRIVE:
     sentry_sdk.Hub.current.start_session()